@@ -1,14 +1,45 @@
 ## Data Center Map Web Scraper
 ###### Scrapes data center information from datacentermap.com
+import asyncio
+import csv
+import functools
+import hashlib
+import html
+import json
+import random
 import requests
+import aiohttp
+from aiolimiter import AsyncLimiter
 from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import time
 import logging
 import re
 import os
+import threading
+import requests_cache
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field, fields
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, the index cache is simply unlocked
+    fcntl = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; the stdlib parser gives the same result, just slower
+    from json import loads as json_loads
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,57 +48,737 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+BASE_URL = "https://www.datacentermap.com"
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Paths disallowed by robots.txt (/ui/, /api/, /visit/, /as/, /legal/, /c/)
+DISALLOWED_RE = re.compile(r'/(?:ui|api|visit|as|legal|c)/')
+
+
+@dataclass(slots=True)
+class DCRecord:
+    """One scraped data center; field order is the column order of the output CSVs"""
+    url: str
+    name: Optional[str] = None
+    operator: Optional[str] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: str = 'Texas'
+    country: str = 'United States'
+    postal_code: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    power_capacity_mw: Optional[float] = None
+    building_size_sqft: Optional[int] = None
+    whitespace_sqft: Optional[int] = None
+    tier_rating: Optional[str] = None
+    year_operational: Optional[int] = None
+    certifications: List[str] = field(default_factory=list)
+    description: Optional[str] = None
+
+
+FIELDNAMES = [f.name for f in fields(DCRecord)]
+
+# Specification patterns fused into one alternation so each element's text is scanned once;
+# the named group that matched says which field it fills
+SPEC_RE = re.compile(
+    r'(?P<mw>\d+(?:\.\d+)?)\s*mw'
+    r'|(?P<sqft>\d[\d,]*)\s*(?:sq\.?\s*ft|sqft|square\s*feet)'
+    r'|whitespace[:\s]*(?P<ws>\d[\d,]*)\s*(?:sq\.?\s*ft|sqft)'
+    r'|tier\s*(?P<tier>[IViv1-4]+)'
+    r'|(?:year|opened|operational|built)[:\s]*(?P<year>(?:19|20)\d{2})',
+    re.IGNORECASE
+)
+SPEC_FIELDS = {
+    'mw': ('power_capacity_mw', float),
+    'sqft': ('building_size_sqft', lambda v: int(v.replace(',', ''))),
+    'ws': ('whitespace_sqft', lambda v: int(v.replace(',', ''))),
+    'tier': ('tier_rating', str.upper),
+    'year': ('year_operational', int),
+}
+
+# Where each record field lives in the __NEXT_DATA__ data center object:
+# (record column, nested section or None for top level, key, converter)
+JSON_FIELDS = (
+    ('name', None, 'name', None),
+    ('latitude', None, 'latitude', float),
+    ('longitude', None, 'longitude', float),
+    ('city', None, 'city', None),
+    ('postal_code', None, 'postal', None),
+    ('address', None, 'address', None),
+    ('power_capacity_mw', 'meta_power', 'totalmw', float),
+    ('building_size_sqft', 'meta_building', 'area_building', int),
+    ('whitespace_sqft', 'meta_building', 'area_whitespace', int),
+    ('year_operational', 'meta_building', 'year_operational', int),
+    ('tier_rating', 'meta_standards', 'tier_designed', 'TIER {}'.format),
+    ('operator', 'companies', 'name', None),
+)
+
+SPEC_COLUMNS = tuple(column for column, _ in SPEC_FIELDS.values())
+
+# Elements only the HTML tree can read (certifications, description blocks).
+# Over-matching just builds the tree; missing one would drop data
+HTML_ONLY_CLASS_RE = re.compile(
+    rb"""\bclass\s*=\s*["'][^"']*\b(?:certifications?|badge|award|description|about|overview)\b""",
+    re.IGNORECASE
+)
+
+# Description meta tag, matched on the raw page when no HTML tree is built.
+# Attributes may be double-, single- or unquoted; the content is in group 1, 2 or 3
+META_DESCRIPTION_RE = re.compile(
+    rb"""<meta(?=[^>]*\bname\s*=\s*["']?description["'\s/>])[^>]*"""
+    rb"""\bcontent\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""",
+    re.IGNORECASE
+)
+
+# Link filters evaluated by lxml in C. City pages look like /usa/texas/city/
+# (exactly 4 slashes, trailing slash); data center pages like
+# /usa/texas/city/facility-name/ (5+ slashes)
+_SLASH_COUNT = "string-length(@href) - string-length(translate(@href, '/', ''))"
+_CITY_LINK = f"contains(@href, '/usa/texas/') and substring(@href, string-length(@href)) = '/' and {_SLASH_COUNT} = 4"
+TABLE_CITY_LINKS_XPATH = etree.XPath(f"//table//a[{_CITY_LINK}]/@href")
+CITY_LINKS_XPATH = etree.XPath(f"//a[{_CITY_LINK}]/@href")
+DATACENTER_LINKS_XPATH = etree.XPath(f"//a[contains(@href, '/usa/texas/') and {_SLASH_COUNT} >= 5]/@href")
+
+# Listing pages are only scanned for hrefs: skip the id index and comment
+# nodes, and keep lxml's default document size limits
+LINK_PARSER = lxml.html.HTMLParser(huge_tree=False, collect_ids=False, remove_comments=True)
+
+# Placeholder names the site serves instead of a real data center page
+ERROR_PAGE_RE = re.compile(r"full capacity|right place|you're in the right", re.IGNORECASE)
+
+# Coordinate pair in inline scripts, e.g. lat: 32.7767, lng: -96.7970 - both values
+# in one pass. Groups 1/2 are lat/lng in that order, 3/4 lng/lat when reversed
+COORD_RE = re.compile(
+    r'lat[^-\d]{0,10}([+-]?\d+\.\d+)[^-\d]{0,40}l(?:ng|on)[^-\d]{0,10}([+-]?\d+\.\d+)'
+    r'|l(?:ng|on)[^-\d]{0,10}([+-]?\d+\.\d+)[^-\d]{0,40}lat[^-\d]{0,10}([+-]?\d+\.\d+)',
+    re.IGNORECASE
+)
+
+# Per-key fallbacks for scripts whose keys are too far apart, or split by
+# other numbers (e.g. lat: 32.7767, zoom: 12, lng: -96.7970), for COORD_RE
+LAT_RE = re.compile(r'lat[:\s]*([+-]?\d+\.\d+)', re.IGNORECASE)
+LNG_RE = re.compile(r'l(?:ng|on)[:\s]*([+-]?\d+\.\d+)', re.IGNORECASE)
+
+
+def is_error_page(name: Optional[str]) -> bool:
+    """Check whether a scraped name is an error page placeholder rather than a facility"""
+    return bool(name) and ERROR_PAGE_RE.search(name) is not None
+
+
+def extract_city_urls(content: bytes, base_url: str = BASE_URL) -> List[str]:
+    """
+    Parse city/market URLs out of the Texas page
+    
+    Args:
+        content: Raw HTML of the Texas page
+        base_url: Site root used to resolve relative links
+        
+    Returns:
+        List of city URLs in Texas
+    """
+    tree = lxml.html.fromstring(content, parser=LINK_PARSER)
+    
+    # Find the table containing city links (debug showed 1 table with 25 links)
+    if tree.find('.//table') is None:
+        logger.warning("No tables found, trying alternative method")
+        # Fallback: find all links matching /usa/texas/city/ pattern
+        hrefs = CITY_LINKS_XPATH(tree)
+    else:
+        hrefs = TABLE_CITY_LINKS_XPATH(tree)
+    
+    city_urls = []
+    seen = set()
+    for href in hrefs:
+        if href in ['/usa/texas/', '/usa/texas/quote/']:  # Exclude main page and quote page
+            continue
+        full_url = urljoin(base_url, href)
+        if full_url not in seen:
+            seen.add(full_url)
+            city_name = href.split('/')[-2]
+            city_urls.append(full_url)
+            logger.info(f"Found city: {city_name}")
+    
+    return city_urls
+
+
+def extract_datacenter_urls(content: bytes, base_url: str = BASE_URL) -> List[str]:
+    """
+    Parse data center URLs out of a city (or state) page
+    
+    Args:
+        content: Raw HTML of the page
+        base_url: Site root used to resolve relative links
+        
+    Returns:
+        List of data center URLs linked from the page
+    """
+    tree = lxml.html.fromstring(content, parser=LINK_PARSER)
+    dc_urls = []
+    seen = set()
+    
+    for href in DATACENTER_LINKS_XPATH(tree):
+        # Skip if it's a quote page or a path disallowed by robots.txt
+        if '/quote/' in href or DISALLOWED_RE.search(href):
+            continue
+        full_url = urljoin(base_url, href)
+        if full_url not in seen:
+            seen.add(full_url)
+            dc_urls.append(full_url)
+            logger.debug(f"Found DC: {href}")
+    
+    return dc_urls
+
+
+def find_next_data(content: bytes) -> Optional[bytes]:
+    """
+    Slice the __NEXT_DATA__ JSON payload out of the raw page
+    
+    The payload lives in a single well-known script tag, so a byte search
+    finds it without building an HTML tree.
+    
+    Args:
+        content: Raw HTML of the page
+        
+    Returns:
+        JSON bytes, or None if the page has no __NEXT_DATA__ script
+    """
+    start = content.find(b'id="__NEXT_DATA__"')
+    if start == -1:
+        return None
+    body_start = content.find(b'>', start) + 1
+    body_end = content.find(b'</script>', body_start)
+    if body_start == 0 or body_end == -1:
+        return None
+    return content[body_start:body_end]
+
+
+def parse_data_center_page(url: str, content: bytes) -> DCRecord:
+    """
+    Parse an individual data center detail page
+    
+    Kept at module level (no scraper state) so it can run in a worker process.
+    
+    Args:
+        url: URL of data center page
+        content: Raw HTML of the page
+        
+    Returns:
+        DCRecord with the data center information
+    """
+    data = DCRecord(url=url)
+    
+    # PRIORITY: Extract from JSON first (most reliable)
+    next_data_json = find_next_data(content)
+    if next_data_json:
+        try:
+            next_data = json_loads(next_data_json)
+            
+            # Navigate to the dc (data center) object in the JSON
+            dc_data = next_data.get('props', {}).get('pageProps', {}).get('dc', {})
+            
+            if dc_data and isinstance(dc_data, dict):
+                fill_from_json(data, dc_data)
+                logger.info(f"Extracted data from JSON: lat={data.latitude}, lng={data.longitude}")
+        except (ValueError, KeyError, AttributeError, TypeError) as e:
+            logger.warning(f"Could not parse __NEXT_DATA__: {e}")
+    
+    # Only build the HTML tree when JSON left something for the fallbacks to
+    # fill, or the page has certification/description elements to read
+    needs_html = (not data.name or not data.operator or data.latitude is None
+                  or any(getattr(data, column) is None for column in SPEC_COLUMNS)
+                  or HTML_ONLY_CLASS_RE.search(content) is not None)
+    if needs_html:
+        soup = BeautifulSoup(content, 'lxml')
+        try:
+            fill_from_html(data, soup)
+        finally:
+            # Break the tree's parent/child cycles now rather than waiting on
+            # the cyclic GC, so a worker's peak stays at one page
+            soup.decompose()
+    else:
+        desc_match = META_DESCRIPTION_RE.search(content)
+        if desc_match:
+            data.description = html.unescape(desc_match.group(desc_match.lastindex).decode('utf-8', 'replace')).strip()
+    
+    return data
+
+
+def fill_from_json(data: DCRecord, dc_data: dict) -> None:
+    """
+    Copy fields out of the __NEXT_DATA__ data center object
+    
+    Driven by the JSON_FIELDS table: empty values are skipped and a value
+    that fails its conversion leaves that one field unset.
+    
+    Args:
+        data: Record from parse_data_center_page, updated in place
+        dc_data: The props.pageProps.dc object
+    """
+    for column, section, key, convert in JSON_FIELDS:
+        source = dc_data if section is None else dc_data.get(section)
+        if not isinstance(source, dict):
+            continue
+        value = source.get(key)
+        if not value:
+            continue
+        try:
+            setattr(data, column, convert(value) if convert else value)
+        except (ValueError, TypeError):
+            pass
+
+
+def fill_from_html(data: DCRecord, soup: BeautifulSoup) -> None:
+    """
+    Fill fields the JSON payload didn't provide from the parsed page
+    
+    Args:
+        data: Record from parse_data_center_page, updated in place
+        soup: Parsed page
+    """
+    # Only use HTML fallback if JSON didn't provide name (indicates error/placeholder page)
+    if not data.name:
+        # Extract name from HTML only as fallback
+        name_selectors = ['h1.datacenter-name', 'h1', '.facility-name']
+        for selector in name_selectors:
+            name_elem = soup.select_one(selector)
+            if name_elem:
+                name_text = name_elem.get_text(strip=True)
+                # Skip if it's an error message
+                if not is_error_page(name_text):
+                    data.name = name_text
+                    break
+    
+    # Extract operator from HTML only if not from JSON
+    if not data.operator:
+        operator_selectors = ['.provider-name', '.operator', '.company-name', 'a[href*="/company/"]']
+        for selector in operator_selectors:
+            operator_elem = soup.select_one(selector)
+            if operator_elem:
+                operator_text = operator_elem.get_text(strip=True)
+                # Skip generic text
+                if operator_text and operator_text != "Follow on LinkedIn":
+                    data.operator = operator_text
+                    break
+    
+    # Fallback methods if JSON extraction didn't provide coordinates
+    if data.latitude is None:
+        # Method 1: Look for meta tags (backup)
+        lat_meta = soup.find('meta', {'name': 'geo.position'})
+        if lat_meta:
+            coords = lat_meta.get('content', '').split(';')
+            if len(coords) == 2:
+                try:
+                    data.latitude = float(coords[0].strip())
+                    data.longitude = float(coords[1].strip())
+                except ValueError:
+                    pass
+        
+        # Method 2: Look for separate lat/long meta tags (backup)
+        if data.latitude is None:
+            lat_meta = soup.find('meta', {'name': 'geo.latitude'})
+            lon_meta = soup.find('meta', {'name': 'geo.longitude'})
+            if lat_meta and lon_meta:
+                try:
+                    data.latitude = float(lat_meta.get('content', ''))
+                    data.longitude = float(lon_meta.get('content', ''))
+                except ValueError:
+                    pass
+        
+        # Method 3: Look in script tags for coordinate patterns (backup)
+        if data.latitude is None:
+            scripts = soup.find_all('script')
+            for script in scripts:
+                script_text = script.string or ''
+                # Most scripts carry no coordinates; a substring check is far cheaper than the regex
+                lowered = script_text.lower()
+                if 'lat' not in lowered or ('lng' not in lowered and 'lon' not in lowered):
+                    continue
+                # Look for common patterns like: lat: 32.7767, lng: -96.7970
+                coord_match = COORD_RE.search(script_text)
+                if coord_match:
+                    lat_text, lng_text, rev_lng, rev_lat = coord_match.groups()
+                    lat_text, lng_text = lat_text or rev_lat, lng_text or rev_lng
+                else:
+                    lat_match = LAT_RE.search(script_text)
+                    lng_match = LNG_RE.search(script_text)
+                    if not (lat_match and lng_match):
+                        continue
+                    lat_text, lng_text = lat_match.group(1), lng_match.group(1)
+                try:
+                    potential_lat = float(lat_text)
+                    potential_lng = float(lng_text)
+                    # Sanity check: Texas is roughly lat 25-36, lng -106 to -93
+                    if 25 <= potential_lat <= 37 and -107 <= potential_lng <= -93:
+                        data.latitude = potential_lat
+                        data.longitude = potential_lng
+                        break
+                except ValueError:
+                    pass
+    
+    # Extract specifications from tables/spec blocks only when JSON left a gap
+    needed = {column for column in SPEC_COLUMNS if getattr(data, column) is None}
+    if needed:
+        spec_elements = soup.select('table tr, dl, .spec-item, .specification')
+        
+        for elem in spec_elements:
+            # Stop walking elements as soon as every missing field is filled
+            if not needed:
+                break
+            text = elem.get_text()  # SPEC_RE is case-insensitive, no need to lower()
+            
+            for match in SPEC_RE.finditer(text):
+                column, convert = SPEC_FIELDS[match.lastgroup]
+                if column in needed:
+                    setattr(data, column, convert(match.group(match.lastgroup)))
+                    needed.discard(column)
+    
+    # Extract certifications
+    cert_keywords = ['iso', 'leed', 'tier', 'uptime', 'soc', 'pci', 'hipaa']
+    cert_elements = soup.select('.certifications, .certification, .badge, .award')
+    for cert in cert_elements:
+        cert_text = cert.get_text(strip=True)
+        if cert_text and any(keyword in cert_text.lower() for keyword in cert_keywords):
+            data.certifications.append(cert_text)
+    
+    # Extract description
+    desc_selectors = ['.description', '.about', '.overview', 'meta[name="description"]']
+    for selector in desc_selectors:
+        desc_elem = soup.select_one(selector)
+        if desc_elem:
+            if desc_elem.name == 'meta':
+                data.description = desc_elem.get('content', '').strip()
+            else:
+                data.description = desc_elem.get_text(strip=True)
+            break
+
+
+def rate_limit_wait(headers) -> Optional[float]:
+    """
+    Seconds the server asked us to wait before the next request
+    
+    Reads Retry-After (delta seconds or HTTP date), then X-RateLimit-Reset /
+    X-RateLimit-Remaining (reset as epoch timestamp or delta seconds): the
+    rest of the window is spread evenly over the requests still allowed, so
+    an exhausted quota waits out the whole window.
+    
+    Args:
+        headers: Response headers
+        
+    Returns:
+        Wait in seconds, or None if the response doesn't ask for one
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        if retry_after.strip().isdigit():
+            return float(retry_after)
+        try:
+            return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    
+    reset = headers.get('X-RateLimit-Reset')
+    remaining = headers.get('X-RateLimit-Remaining')
+    if reset and remaining and remaining.strip().isdigit():
+        try:
+            reset = float(reset)
+        except ValueError:
+            return None
+        window = max(0.0, reset - time.time()) if reset > 1e9 else reset
+        return window / max(int(remaining), 1)
+    return None
+
+
+# Ceiling for the exponential backoff after repeated 429/5xx responses
+MAX_BACKOFF = 15 * 60
+
+# Transient statuses worth retrying, and how many tries a page gets in total
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+FETCH_ATTEMPTS = 6
+
+
+INDEX_CACHE_FILE = 'city_index.json'
+INDEX_CACHE_TTL = 7 * 24 * 3600  # market/city listings change rarely
+
+
+@contextmanager
+def _locked_json(path: str):
+    """
+    Read a JSON cache file under an exclusive lock; yields its entries
+    
+    The lock is held on a sidecar .lock file so the cache itself can be
+    swapped out with os.replace. A missing or unreadable (e.g. truncated)
+    cache counts as empty.
+    """
+    with open(path + '.lock', 'a', encoding='utf-8') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            entries = {}
+            try:
+                with open(path, encoding='utf-8') as f:
+                    entries = json.load(f)
+            except FileNotFoundError:
+                pass
+            except ValueError as e:
+                logger.warning(f"Ignoring unreadable cache {path}: {e}")
+            yield entries if isinstance(entries, dict) else {}
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _write_json(path: str, entries: dict) -> None:
+    """Write a JSON cache file atomically through a temp file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+    os.replace(tmp_path, path)
+
+
+def disk_memoize(filename: str, ttl: float):
+    """
+    Cache a scraper method's result in a JSON file under its output_dir
+    
+    Entries are keyed by method name and a hash of the arguments and reused
+    while younger than `ttl` seconds. Empty results are not cached, and
+    `self.refresh_index` forces a refetch. Works on plain and async methods.
+    
+    Args:
+        filename: Cache file name inside the scraper's output_dir
+        ttl: Maximum age of a cached entry in seconds
+    """
+    def decorator(func):
+        def cache_key(args) -> str:
+            arg_hash = hashlib.sha1(json.dumps(args).encode()).hexdigest()
+            return f"{func.__name__}:{arg_hash}"
+        
+        def lookup(self, key: str):
+            if self.refresh_index:
+                return None
+            path = os.path.join(self.output_dir, filename)
+            if not os.path.exists(path):
+                return None
+            with _locked_json(path) as entries:
+                entry = entries.get(key)
+            if isinstance(entry, dict) and time.time() - entry.get('ts', 0) < ttl:
+                logger.info(f"Using cached {func.__name__} result from {path}")
+                return entry['result']
+            return None
+        
+        def store(self, key: str, result) -> None:
+            if not result:
+                return
+            path = os.path.join(self.output_dir, filename)
+            with _locked_json(path) as entries:
+                entries[key] = {'ts': time.time(), 'result': result}
+                _write_json(path, entries)
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args):
+                key = cache_key(args)
+                result = lookup(self, key)
+                if result is None:
+                    result = await func(self, *args)
+                    store(self, key, result)
+                return result
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            key = cache_key(args)
+            result = lookup(self, key)
+            if result is None:
+                result = func(self, *args)
+                store(self, key, result)
+            return result
+        return wrapper
+    return decorator
+
+
 class TexasDataCenterScraper:
     """Scraper for datacentermap.com - Texas data centers only"""
     
-    def __init__(self, delay: float = 30.0, output_dir: str = '.'):
+    def __init__(self, delay: float = 30.0, output_dir: str = '.', refresh_index: bool = False,
+                 session: Optional[requests.Session] = None):
         """
         Initialize scraper with robots.txt compliant delay
         
         Args:
             delay: Delay between requests (30s per robots.txt for AI crawlers)
             output_dir: Directory to save output files (default: current directory)
+            refresh_index: Ignore cached city/data center URL lists and refetch them
+            session: Shared HTTP session to use instead of the default cached one;
+                the caller owns it and closes it
         """
-        self.base_url = "https://www.datacentermap.com"
+        self.base_url = BASE_URL
         self.delay = delay  # 30 seconds as per robots.txt
         self.output_dir = output_dir
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.refresh_index = refresh_index
         
         # Create output directory if it doesn't exist
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             logger.info(f"Created output directory: {output_dir}")
         
-    def get_page(self, url: str) -> Optional[BeautifulSoup]:
+        if session is not None:
+            self.session = session
+        else:
+            # Responses are cached on disk so reruns/resumes don't refetch pages
+            self.session = requests_cache.CachedSession(
+                os.path.join(output_dir, 'texas_dc_cache.sqlite'),
+                expire_after=timedelta(days=7),
+                allowable_codes=(200,)
+            )
+            self.session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Connection': 'keep-alive',
+                'Keep-Alive': 'timeout=60'
+            })
+            
+            # Reuse pooled connections to the host and retry connection errors with
+            # exponential backoff. 429/5xx responses are retried by get_page instead,
+            # so every one of them reaches _note_response and slows down all workers
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=16,
+                max_retries=Retry(
+                    total=FETCH_ATTEMPTS - 1,
+                    backoff_factor=2,
+                    status=0,
+                    respect_retry_after_header=False
+                )
+            )
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+        
+        # Per host: monotonic time before which no request should go out, the
+        # end of the latest backoff the host asked for, and the run of
+        # consecutive 429/5xx responses driving the backoff
+        self._next_allowed: Dict[str, float] = {}
+        self._backoff_until: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+        self._slot_lock = threading.Lock()  # get_page may be called from worker threads
+    
+    @staticmethod
+    def is_disallowed(url: str) -> bool:
+        """Check a URL against the robots.txt disallowed paths"""
+        if DISALLOWED_RE.search(url):
+            logger.warning(f"Skipping disallowed URL per robots.txt: {url}")
+            return True
+        return False
+        
+    def get_page(self, url: str) -> Optional[bytes]:
         """
-        Fetch and parse a webpage with robots.txt compliance
+        Fetch a webpage with robots.txt compliance
         
         Args:
             url: URL to fetch
             
         Returns:
-            BeautifulSoup object or None if error
+            Raw page content or None if error
         """
-        # Check robots.txt disallowed paths
-        disallowed_paths = ['/ui/', '/api/', '/visit/', '/as/', '/legal/', '/c/']
-        for path in disallowed_paths:
-            if path in url:
-                logger.warning(f"Skipping disallowed URL per robots.txt: {url}")
+        if self.is_disallowed(url):
+            return None
+        
+        for attempt in range(1, FETCH_ATTEMPTS + 1):
+            try:
+                if self.is_cached(url):
+                    logger.info(f"Fetching (cached): {url}")
+                else:
+                    self._throttle(url)  # 30-second spacing per robots.txt
+                    logger.info(f"Fetching: {url}")
+                response = self.session.get(url, timeout=30)
+                if not getattr(response, 'from_cache', False):
+                    self._note_response(url, response.status_code, response.headers)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.content
+            except requests.RequestException as e:
+                logger.error(f"Error fetching {url}: {e}")
                 return None
+            
+            # The retry waits behind the backoff _note_response just booked
+            if attempt < FETCH_ATTEMPTS:
+                logger.warning(f"Retrying {url} after HTTP {response.status_code} "
+                               f"(attempt {attempt}/{FETCH_ATTEMPTS})")
         
-        try:
-            time.sleep(self.delay)  # 30-second delay per robots.txt
-            logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except requests.RequestException as e:
-            logger.error(f"Error fetching {url}: {e}")
-            return None
+        logger.error(f"Error fetching {url}: HTTP {response.status_code}, "
+                     f"giving up after {FETCH_ATTEMPTS} attempts")
+        return None
     
+    def _reserve_slot(self, url: str) -> float:
+        """
+        Book the host's next request slot and return the seconds until it
+        
+        Slots are handed out one `delay` apart, starting no earlier than any
+        backoff the host asked for, so waiters never fire together. The
+        robots.txt delay is measured from the previous request to the host,
+        so time spent downloading and parsing counts toward it.
+        """
+        host = urlsplit(url).netloc
+        with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, 0.0))
+            self._next_allowed[host] = slot + self.delay
+        return slot - now
+    
+    def _backed_off(self, url: str) -> bool:
+        """Whether a backoff the URL's host asked for is still running"""
+        return self._backoff_until.get(urlsplit(url).netloc, 0.0) > time.monotonic()
+    
+    def _throttle(self, url: str) -> None:
+        """
+        Wait for the next request slot for the URL's host
+        
+        A slot booked before another worker's response started a backoff is
+        given up, and a fresh one booked after the backoff instead.
+        """
+        while True:
+            wait = self._reserve_slot(url)
+            if wait > 0:
+                time.sleep(wait)
+            if not self._backed_off(url):
+                return
+    
+    def _note_response(self, url: str, status: int, headers) -> None:
+        """
+        Push the host's next slot out if the response calls for a longer wait
+        
+        Rate-limit headers win when present; otherwise 429/5xx responses back
+        off exponentially (with jitter) per consecutive failure. The robots.txt
+        delay stays the floor either way.
+        """
+        host = urlsplit(url).netloc
+        wait = rate_limit_wait(headers)
+        with self._slot_lock:
+            if status == 429 or status >= 500:
+                failures = self._failures.get(host, 0) + 1
+                self._failures[host] = failures
+                if wait is None:
+                    wait = min(MAX_BACKOFF, self.delay * 2 ** failures) * random.uniform(1.0, 1.25)
+            else:
+                self._failures.pop(host, None)
+            
+            if not wait:
+                return
+            deadline = time.monotonic() + wait
+            self._backoff_until[host] = max(deadline, self._backoff_until.get(host, 0.0))
+            if deadline <= self._next_allowed.get(host, 0.0):
+                return
+            self._next_allowed[host] = deadline
+        logger.warning(f"Backing off {host} for {wait:.0f}s")
+    
+    def is_cached(self, url: str) -> bool:
+        """Check whether a fresh response for the URL is already in the HTTP cache"""
+        if not isinstance(self.session, requests_cache.CachedSession):
+            return False
+        request = self.session.prepare_request(requests.Request('GET', url))
+        cached = self.session.cache.get_response(self.session.cache.create_key(request))
+        return cached is not None and not cached.is_expired
+    
+    @disk_memoize(INDEX_CACHE_FILE, ttl=INDEX_CACHE_TTL)
     def get_texas_city_urls(self) -> List[str]:
         """
         Get all city/market URLs from Texas page
@@ -78,48 +789,16 @@ class TexasDataCenterScraper:
         # Texas main page - shows markets/cities in a table
         texas_url = f"{self.base_url}/usa/texas/"
         
-        soup = self.get_page(texas_url)
-        if not soup:
+        content = self.get_page(texas_url)
+        if not content:
             logger.error("Failed to fetch Texas page")
             return []
         
-        city_urls = []
-        
-        # Find the table containing city links (debug showed 1 table with 25 links)
-        tables = soup.find_all('table')
-        
-        if not tables:
-            logger.warning("No tables found, trying alternative method")
-            # Fallback: find all links matching /usa/texas/city/ pattern
-            all_links = soup.find_all('a', href=True)
-            for link in all_links:
-                href = link.get('href', '')
-                if '/usa/texas/' in href and href.count('/') == 4 and href.endswith('/'):
-                    # Pattern: /usa/texas/city/ (exactly 4 slashes, ends with /)
-                    if href not in ['/usa/texas/', '/usa/texas/quote/']:  # Exclude main page and quote page
-                        full_url = urljoin(self.base_url, href)
-                        if full_url not in city_urls:
-                            city_name = href.split('/')[-2]
-                            city_urls.append(full_url)
-                            logger.info(f"Found city: {city_name}")
-        else:
-            # Extract links from the table
-            for table in tables:
-                links = table.find_all('a', href=True)
-                for link in links:
-                    href = link.get('href', '')
-                    # City links follow pattern: /usa/texas/city-name/
-                    if '/usa/texas/' in href and href.count('/') == 4 and href.endswith('/'):
-                        if href not in ['/usa/texas/', '/usa/texas/quote/']:
-                            full_url = urljoin(self.base_url, href)
-                            if full_url not in city_urls:
-                                city_name = href.split('/')[-2]
-                                city_urls.append(full_url)
-                                logger.info(f"Found city: {city_name}")
-        
+        city_urls = extract_city_urls(content, self.base_url)
         logger.info(f"Found {len(city_urls)} cities in Texas")
         return city_urls
     
+    @disk_memoize(INDEX_CACHE_FILE, ttl=INDEX_CACHE_TTL)
     def get_datacenters_from_city(self, city_url: str) -> List[str]:
         """
         Get all data center URLs from a city page
@@ -130,30 +809,11 @@ class TexasDataCenterScraper:
         Returns:
             List of data center URLs in that city
         """
-        soup = self.get_page(city_url)
-        if not soup:
+        content = self.get_page(city_url)
+        if not content:
             return []
         
-        dc_urls = []
-        
-        # Look for individual data center links in tables or lists
-        # Individual data centers have URLs like: /usa/texas/dallas/facility-name/
-        all_links = soup.find_all('a', href=True)
-        
-        for link in all_links:
-            href = link.get('href', '')
-            text = link.get_text(strip=True)
-            
-            # Data center pages follow pattern: /usa/texas/city/facility-name/
-            # They have more path segments than city pages (5+ slashes)
-            if '/usa/texas/' in href and href.count('/') >= 5:
-                # Skip if it's a quote, visit, or other non-datacenter page
-                if not any(skip in href for skip in ['/quote/', '/visit/', '/api/', '/ui/', '/as/', '/legal/']):
-                    full_url = urljoin(self.base_url, href)
-                    if full_url not in dc_urls:
-                        dc_urls.append(full_url)
-                        logger.debug(f"Found DC: {text[:50]}")
-        
+        dc_urls = extract_datacenter_urls(content, self.base_url)
         logger.info(f"Found {len(dc_urls)} data centers in {city_url}")
         return dc_urls
     
@@ -164,34 +824,28 @@ class TexasDataCenterScraper:
         Returns:
             List of all data center URLs in Texas
         """
-        all_dc_urls = []
-        
         # First, get all city URLs
         city_urls = self.get_texas_city_urls()
         
         if not city_urls:
             logger.warning("No city URLs found. Trying direct approach...")
             # Fallback: try to find data centers directly from main page
-            texas_url = f"{self.base_url}/usa/texas/"
-            soup = self.get_page(texas_url)
-            if soup:
-                all_links = soup.find_all('a', href=True)
-                for link in all_links:
-                    href = link.get('href', '')
-                    if '/usa/texas/' in href and href.count('/') >= 5:
-                        full_url = urljoin(self.base_url, href)
-                        if full_url not in all_dc_urls:
-                            all_dc_urls.append(full_url)
-            
+            content = self.get_page(f"{self.base_url}/usa/texas/")
+            all_dc_urls = extract_datacenter_urls(content, self.base_url) if content else []
             logger.info(f"Direct approach found {len(all_dc_urls)} data center URLs")
             return all_dc_urls
         
         # Then, scrape each city for data centers
+        all_dc_urls = []
         for city_url in city_urls:
             city_dcs = self.get_datacenters_from_city(city_url)
             all_dc_urls.extend(city_dcs)
         
-        # Remove duplicates while preserving order
+        return self._dedupe_urls(all_dc_urls)
+    
+    @staticmethod
+    def _dedupe_urls(all_dc_urls: List[str]) -> List[str]:
+        """Remove duplicates while preserving order"""
         seen = set()
         unique_urls = []
         for url in all_dc_urls:
@@ -202,7 +856,7 @@ class TexasDataCenterScraper:
         logger.info(f"Total unique data center URLs in Texas: {len(unique_urls)}")
         return unique_urls
     
-    def scrape_data_center_page(self, url: str) -> Optional[Dict]:
+    def scrape_data_center_page(self, url: str) -> Optional[DCRecord]:
         """
         Scrape individual data center detail page
         
@@ -210,232 +864,87 @@ class TexasDataCenterScraper:
             url: URL of data center page
             
         Returns:
-            Dictionary of data center information
+            DCRecord with the data center information
         """
-        soup = self.get_page(url)
-        if not soup:
+        content = self.get_page(url)
+        if not content:
             return None
+        dc_data = parse_data_center_page(url, content)
+        self._forget_bad_page(url, dc_data)
+        return dc_data
+    
+    def _forget_bad_page(self, url: str, dc_data: Optional[DCRecord]) -> None:
+        """
+        Evict a cached page that parsed to an error placeholder (or no name)
         
-        data = {
-            'url': url,
-            'name': None,
-            'operator': None,
-            'address': None,
-            'city': None,
-            'state': 'Texas',
-            'country': 'United States',
-            'postal_code': None,
-            'latitude': None,
-            'longitude': None,
-            'power_capacity_mw': None,
-            'building_size_sqft': None,
-            'whitespace_sqft': None,
-            'tier_rating': None,
-            'year_operational': None,
-            'certifications': [],
-            'description': None
-        }
-        
-        # PRIORITY: Extract from JSON first (most reliable)
-        next_data_script = soup.find('script', {'id': '__NEXT_DATA__'})
-        if next_data_script and next_data_script.string:
-            try:
-                import json
-                next_data = json.loads(next_data_script.string)
-                
-                # Navigate to the dc (data center) object in the JSON
-                dc_data = next_data.get('props', {}).get('pageProps', {}).get('dc', {})
-                
-                if dc_data and isinstance(dc_data, dict):
-                    # Extract name from JSON (most reliable)
-                    if 'name' in dc_data and dc_data['name']:
-                        data['name'] = dc_data['name']
-                    
-                    # Extract coordinates
-                    if 'latitude' in dc_data and dc_data['latitude']:
-                        data['latitude'] = float(dc_data['latitude'])
-                    if 'longitude' in dc_data and dc_data['longitude']:
-                        data['longitude'] = float(dc_data['longitude'])
-                    
-                    # Extract other fields from JSON
-                    if 'city' in dc_data and dc_data['city']:
-                        data['city'] = dc_data['city']
-                    if 'postal' in dc_data and dc_data['postal']:
-                        data['postal_code'] = dc_data['postal']
-                    if 'address' in dc_data and dc_data['address']:
-                        data['address'] = dc_data['address']
-                    
-                    # Extract power capacity from meta_power
-                    meta_power = dc_data.get('meta_power', {})
-                    if meta_power and isinstance(meta_power, dict) and 'totalmw' in meta_power:
-                        try:
-                            data['power_capacity_mw'] = float(meta_power['totalmw'])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # Extract building info from meta_building
-                    meta_building = dc_data.get('meta_building', {})
-                    if meta_building and isinstance(meta_building, dict):
-                        if 'area_building' in meta_building:
-                            try:
-                                data['building_size_sqft'] = int(meta_building['area_building'])
-                            except (ValueError, TypeError):
-                                pass
-                        if 'area_whitespace' in meta_building:
-                            try:
-                                data['whitespace_sqft'] = int(meta_building['area_whitespace'])
-                            except (ValueError, TypeError):
-                                pass
-                        if 'year_operational' in meta_building:
-                            try:
-                                data['year_operational'] = int(meta_building['year_operational'])
-                            except (ValueError, TypeError):
-                                pass
-                    
-                    # Extract tier rating from meta_standards
-                    meta_standards = dc_data.get('meta_standards', {})
-                    if meta_standards and isinstance(meta_standards, dict) and 'tier_designed' in meta_standards:
-                        tier = meta_standards['tier_designed']
-                        if tier:
-                            data['tier_rating'] = f"TIER {tier}"
-                    
-                    # Extract operator/company
-                    companies = dc_data.get('companies', {})
-                    if companies and isinstance(companies, dict) and 'name' in companies:
-                        data['operator'] = companies['name']
-                    
-                    logger.info(f"Extracted data from JSON: lat={data['latitude']}, lng={data['longitude']}")
-            except (json.JSONDecodeError, KeyError, AttributeError, TypeError) as e:
-                logger.warning(f"Could not parse __NEXT_DATA__: {e}")
-        
-        # Only use HTML fallback if JSON didn't provide name (indicates error/placeholder page)
-        if not data['name']:
-            # Extract name from HTML only as fallback
-            name_selectors = ['h1.datacenter-name', 'h1', '.facility-name']
-            for selector in name_selectors:
-                name_elem = soup.select_one(selector)
-                if name_elem:
-                    name_text = name_elem.get_text(strip=True)
-                    # Skip if it's an error message
-                    if "full capacity" not in name_text.lower() and "right place" not in name_text.lower():
-                        data['name'] = name_text
-                        break
-        
-        # Extract operator from HTML only if not from JSON
-        if not data['operator']:
-            operator_selectors = ['.provider-name', '.operator', '.company-name', 'a[href*="/company/"]']
-            for selector in operator_selectors:
-                operator_elem = soup.select_one(selector)
-                if operator_elem:
-                    operator_text = operator_elem.get_text(strip=True)
-                    # Skip generic text
-                    if operator_text and operator_text != "Follow on LinkedIn":
-                        data['operator'] = operator_text
-                        break
-        
-        # Fallback methods if JSON extraction didn't work
-        if not data['latitude']:
-            # Method 1: Look for meta tags (backup)
-            lat_meta = soup.find('meta', {'name': 'geo.position'})
-            if lat_meta:
-                coords = lat_meta.get('content', '').split(';')
-                if len(coords) == 2:
-                    try:
-                        data['latitude'] = float(coords[0].strip())
-                        data['longitude'] = float(coords[1].strip())
-                    except ValueError:
-                        pass
+        The site serves its "full capacity" pages with a 200, so without this
+        a resume or re-run would replay them from the cache for a week.
+        """
+        if not isinstance(self.session, requests_cache.CachedSession):
+            return
+        if dc_data is None or not dc_data.name or is_error_page(dc_data.name):
+            self.session.cache.delete(urls=[url])
+            logger.info(f"Dropped cached error page: {url}")
+    
+    def _prepare_urls(self, dc_urls: List[str], max_datacenters: Optional[int],
+                      start_index: int, output_prefix: str) -> List[str]:
+        """Save the full URL list, then apply the max/resume limits"""
+        # Save the URL list for reference
+        url_list_file = os.path.join(self.output_dir, f'{output_prefix}_urls.txt')
+        with open(url_list_file, 'w') as f:
+            for idx, url in enumerate(dc_urls):
+                f.write(f"{idx},{url}\n")
+        logger.info(f"Saved {len(dc_urls)} URLs to {url_list_file}")
         
-        # Method 2: Look for separate lat/long meta tags (backup)
-        if not data['latitude']:
-            lat_meta = soup.find('meta', {'name': 'geo.latitude'})
-            lon_meta = soup.find('meta', {'name': 'geo.longitude'})
-            if lat_meta and lon_meta:
-                try:
-                    data['latitude'] = float(lat_meta.get('content', ''))
-                    data['longitude'] = float(lon_meta.get('content', ''))
-                except ValueError:
-                    pass
+        # Limit if specified
+        if max_datacenters:
+            dc_urls = dc_urls[:max_datacenters]
+            logger.info(f"Limited to {max_datacenters} data centers for scraping")
         
-        # Method 3: Look in script tags for coordinate patterns (backup)
-        if not data['latitude']:
-            scripts = soup.find_all('script')
-            for script in scripts:
-                script_text = script.string if script.string else ''
-                # Look for common patterns like: lat: 32.7767, lng: -96.7970
-                lat_match = re.search(r'lat[:\s]*([+-]?\d+\.\d+)', script_text, re.IGNORECASE)
-                lng_match = re.search(r'l(?:ng|on)[:\s]*([+-]?\d+\.\d+)', script_text, re.IGNORECASE)
-                if lat_match and lng_match:
-                    try:
-                        potential_lat = float(lat_match.group(1))
-                        potential_lng = float(lng_match.group(1))
-                        # Sanity check: Texas is roughly lat 25-36, lng -106 to -93
-                        if 25 <= potential_lat <= 37 and -107 <= potential_lng <= -93:
-                            data['latitude'] = potential_lat
-                            data['longitude'] = potential_lng
-                            break
-                    except ValueError:
-                        pass
-        
-        # Extract all text content for specifications
-        page_text = soup.get_text().lower()
-        
-        # Extract specifications from tables, lists, or text
-        spec_elements = soup.select('.spec-item, .specification, tr, li, p, div')
+        # Apply start_index for resuming
+        if start_index > 0:
+            logger.info(f"Resuming from index {start_index}")
+            dc_urls = dc_urls[start_index:]
         
-        for elem in spec_elements:
-            text = elem.get_text().lower()
-            
-            # Power capacity
-            if not data['power_capacity_mw']:
-                power_match = re.search(r'(\d+(?:\.\d+)?)\s*mw', text, re.IGNORECASE)
-                if power_match:
-                    data['power_capacity_mw'] = float(power_match.group(1))
-            
-            # Building size
-            if not data['building_size_sqft']:
-                size_match = re.search(r'([\d,]+)\s*(?:sq\.?\s*ft|sqft|square\s*feet)', text, re.IGNORECASE)
-                if size_match:
-                    data['building_size_sqft'] = int(size_match.group(1).replace(',', ''))
-            
-            # Whitespace
-            if not data['whitespace_sqft']:
-                ws_match = re.search(r'whitespace[:\s]*([\d,]+)\s*(?:sq\.?\s*ft|sqft)', text, re.IGNORECASE)
-                if ws_match:
-                    data['whitespace_sqft'] = int(ws_match.group(1).replace(',', ''))
-            
-            # Tier rating
-            if not data['tier_rating']:
-                tier_match = re.search(r'tier\s*([IViv1-4]+)', text, re.IGNORECASE)
-                if tier_match:
-                    data['tier_rating'] = tier_match.group(1).upper()
-            
-            # Year operational
-            if not data['year_operational']:
-                year_match = re.search(r'(?:year|opened|operational|built)[:\s]*(19|20)\d{2}', text, re.IGNORECASE)
-                if year_match:
-                    data['year_operational'] = int(year_match.group(1))
-        
-        # Extract certifications
-        cert_keywords = ['iso', 'leed', 'tier', 'uptime', 'soc', 'pci', 'hipaa']
-        cert_elements = soup.select('.certifications, .certification, .badge, .award')
-        for cert in cert_elements:
-            cert_text = cert.get_text(strip=True)
-            if cert_text and any(keyword in cert_text.lower() for keyword in cert_keywords):
-                data['certifications'].append(cert_text)
-        
-        # Extract description
-        desc_selectors = ['.description', '.about', '.overview', 'meta[name="description"]']
-        for selector in desc_selectors:
-            desc_elem = soup.select_one(selector)
-            if desc_elem:
-                if desc_elem.name == 'meta':
-                    data['description'] = desc_elem.get('content', '').strip()
-                else:
-                    data['description'] = desc_elem.get_text(strip=True)
-                break
+        return dc_urls
+    
+    def _record_result(self, writer: csv.DictWriter, dc_url: str, dc_data: Optional[DCRecord]) -> bool:
+        """Write a scraped record to the final CSV if the page produced a name"""
+        if dc_data and dc_data.name:
+            writer.writerow(asdict(dc_data))
+            logger.info(f"Successfully scraped: {dc_data.name}")
+            return True
+        logger.warning(f"Failed to scrape or no data found for: {dc_url}")
+        return False
+    
+    def _save_checkpoint(self, new_data: List[DCRecord], count: int, total: int, output_prefix: str) -> None:
+        """
+        Write the records scraped since the last checkpoint to a chunk file
         
-        return data
+        Each chunk holds only its own slice, so a checkpoint costs O(chunk_size)
+        rather than rewriting everything scraped so far; merge_chunks stitches them.
+        """
+        chunk_file = os.path.join(self.output_dir, f'{output_prefix}_chunk_{count}.csv')
+        with open(chunk_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(asdict(record) for record in new_data)
+        logger.info(f"✓ Saved checkpoint at {count} records to {chunk_file}")
+        logger.info(f"Progress: {count}/{total} ({count/total*100:.1f}%)")
+    
+    def _open_final(self, output_prefix: str):
+        """Open the final CSV for streaming writes; returns (path, file, writer)"""
+        final_file = os.path.join(self.output_dir, f'{output_prefix}_final.csv')
+        f = open(final_file, 'w', newline='', encoding='utf-8')
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        return final_file, f, writer
+    
+    def _load_final(self, final_file: str, count: int) -> pd.DataFrame:
+        """Report the finished final CSV and load it for the caller"""
+        logger.info(f"\nTotal Texas data centers scraped: {count}")
+        logger.info(f"Final data saved to {final_file}")
+        return pd.read_csv(final_file)
     
     def scrape_all_texas(self, max_datacenters: Optional[int] = None, 
                         chunk_size: int = 50,
@@ -457,8 +966,6 @@ class TexasDataCenterScraper:
         logger.info(f"Using {self.delay}s delay between requests per robots.txt")
         logger.info(f"Chunk size: {chunk_size} (saves every ~{chunk_size * self.delay / 60:.1f} minutes)")
         
-        all_data = []
-        
         # Get all Texas data center URLs
         dc_urls = self.get_texas_datacenter_urls()
         
@@ -466,49 +973,226 @@ class TexasDataCenterScraper:
             logger.error("No data center URLs found for Texas")
             return pd.DataFrame()
         
-        # Save the URL list for reference
-        url_list_file = os.path.join(self.output_dir, f'{output_prefix}_urls.txt')
-        with open(url_list_file, 'w') as f:
-            for idx, url in enumerate(dc_urls):
-                f.write(f"{idx},{url}\n")
-        logger.info(f"Saved {len(dc_urls)} URLs to {url_list_file}")
+        dc_urls = self._prepare_urls(dc_urls, max_datacenters, start_index, output_prefix)
+        total = len(dc_urls) + start_index
         
-        # Limit if specified
-        if max_datacenters:
-            dc_urls = dc_urls[:max_datacenters]
-            logger.info(f"Limited to {max_datacenters} data centers for scraping")
-        
-        # Apply start_index for resuming
-        if start_index > 0:
-            logger.info(f"Resuming from index {start_index}")
-            dc_urls = dc_urls[start_index:]
+        # Records go straight to the final CSV as they arrive; only the current
+        # chunk is held in memory for the next checkpoint
+        final_file, final_f, final_writer = self._open_final(output_prefix)
+        new_data = []
+        count = 0
         
-        # Scrape each data center with chunked saving
-        for idx, dc_url in enumerate(dc_urls, start_index):
-            logger.info(f"Processing {idx + 1}/{len(dc_urls) + start_index}: {dc_url}")
-            
-            dc_data = self.scrape_data_center_page(dc_url)
-            if dc_data and dc_data['name']:
-                all_data.append(dc_data)
-                logger.info(f"Successfully scraped: {dc_data['name']}")
-            else:
-                logger.warning(f"Failed to scrape or no data found for: {dc_url}")
+        def finish(idx: int, dc_url: str, future: Optional[Future]) -> None:
+            nonlocal count
+            dc_data = future.result() if future else None
+            if future:
+                self._forget_bad_page(dc_url, dc_data)
+            if self._record_result(final_writer, dc_url, dc_data):
+                new_data.append(dc_data)
+                count += 1
             
             # Save chunk periodically
             if (idx + 1) % chunk_size == 0:
-                chunk_df = pd.DataFrame(all_data)
-                chunk_file = os.path.join(self.output_dir, f'{output_prefix}_chunk_{idx + 1}.csv')
-                chunk_df.to_csv(chunk_file, index=False)
-                logger.info(f"✓ Saved checkpoint at {idx + 1} records to {chunk_file}")
-                logger.info(f"Progress: {idx + 1}/{len(dc_urls) + start_index} ({(idx + 1)/(len(dc_urls) + start_index)*100:.1f}%)")
-        
-        # Final save
-        df = pd.DataFrame(all_data)
-        final_file = os.path.join(self.output_dir, f'{output_prefix}_final.csv')
-        df.to_csv(final_file, index=False)
-        logger.info(f"\nTotal Texas data centers scraped: {len(df)}")
-        logger.info(f"Final data saved to {final_file}")
-        return df
+                final_f.flush()
+                self._save_checkpoint(new_data, idx + 1, total, output_prefix)
+                new_data.clear()
+        
+        # Scrape each data center with chunked saving. Pages are fetched here and
+        # parsed in worker processes, so parsing overlaps the next request's delay;
+        # results are handled in URL order as they finish.
+        pending = deque()
+        with final_f, ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            for idx, dc_url in enumerate(dc_urls, start_index):
+                logger.info(f"Processing {idx + 1}/{total}: {dc_url}")
+                
+                content = self.get_page(dc_url)
+                future = pool.submit(parse_data_center_page, dc_url, content) if content else None
+                pending.append((idx, dc_url, future))
+                
+                while pending and (pending[0][2] is None or pending[0][2].done()):
+                    finish(*pending.popleft())
+            
+            while pending:
+                finish(*pending.popleft())
+        
+        return self._load_final(final_file, count)
+
+
+class AsyncScraper(TexasDataCenterScraper):
+    """
+    Concurrent variant of TexasDataCenterScraper built on asyncio + aiohttp
+    
+    A shared token bucket still lets only one request out per `delay` seconds,
+    but DNS/TLS/response latency and HTML parsing (in a process pool) overlap
+    instead of adding up. Use as an async context manager.
+    """
+    
+    def __init__(self, delay: float = 30.0, output_dir: str = '.', refresh_index: bool = False,
+                 max_workers: int = 64):
+        """
+        Args:
+            delay: Minimum interval between requests across all workers
+            output_dir: Directory to save output files
+            refresh_index: Ignore cached city/data center URL lists and refetch them
+            max_workers: Maximum number of in-flight fetch tasks
+        """
+        # aiohttp does the fetching, so skip the base class's on-disk HTTP cache
+        super().__init__(delay=delay, output_dir=output_dir, refresh_index=refresh_index,
+                         session=requests.Session())
+        self.max_workers = max_workers
+        # AsyncLimiter can't express "no delay"; fall back to no limiting
+        self.limiter = AsyncLimiter(1, delay) if delay > 0 else nullcontext()
+        self.semaphore = asyncio.Semaphore(max_workers)
+        self.aio_session: Optional[aiohttp.ClientSession] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+    
+    async def __aenter__(self) -> 'AsyncScraper':
+        connector = aiohttp.TCPConnector(limit=self.max_workers, limit_per_host=1, keepalive_timeout=75)
+        self.aio_session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        self.executor = ProcessPoolExecutor()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aio_session.close()
+        self.executor.shutdown()
+        self.session.close()
+    
+    async def _parse(self, func, *args):
+        """Run a parsing function in the process pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+    
+    async def _throttle(self, url: str) -> None:
+        """Wait for the next request slot for the URL's host without blocking the loop"""
+        while True:
+            wait = self._reserve_slot(url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if not self._backed_off(url):
+                return
+    
+    async def get_page(self, url: str) -> Optional[bytes]:
+        """
+        Fetch a webpage, waiting for a worker slot and the shared rate limit
+        
+        429/5xx responses and connection errors are retried, each attempt
+        queueing again behind the limiter and any backoff the server asked for.
+        """
+        if self.is_disallowed(url):
+            return None
+        
+        for attempt in range(1, FETCH_ATTEMPTS + 1):
+            async with self.semaphore, self.limiter:
+                await self._throttle(url)
+                logger.info(f"Fetching: {url}")
+                try:
+                    async with self.aio_session.get(url) as response:
+                        self._note_response(url, response.status, response.headers)
+                        if response.status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            return await response.read()
+                        error = f"HTTP {response.status}"
+                except aiohttp.ClientResponseError as e:
+                    logger.error(f"Error fetching {url}: {e}")
+                    return None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = str(e) or type(e).__name__
+            
+            if attempt < FETCH_ATTEMPTS:
+                logger.warning(f"Retrying {url} after {error} (attempt {attempt}/{FETCH_ATTEMPTS})")
+        
+        logger.error(f"Error fetching {url}: {error}, giving up after {FETCH_ATTEMPTS} attempts")
+        return None
+    
+    @disk_memoize(INDEX_CACHE_FILE, ttl=INDEX_CACHE_TTL)
+    async def get_texas_city_urls(self) -> List[str]:
+        content = await self.get_page(f"{self.base_url}/usa/texas/")
+        if not content:
+            logger.error("Failed to fetch Texas page")
+            return []
+        
+        city_urls = await self._parse(extract_city_urls, content, self.base_url)
+        logger.info(f"Found {len(city_urls)} cities in Texas")
+        return city_urls
+    
+    @disk_memoize(INDEX_CACHE_FILE, ttl=INDEX_CACHE_TTL)
+    async def get_datacenters_from_city(self, city_url: str) -> List[str]:
+        content = await self.get_page(city_url)
+        if not content:
+            return []
+        
+        dc_urls = await self._parse(extract_datacenter_urls, content, self.base_url)
+        logger.info(f"Found {len(dc_urls)} data centers in {city_url}")
+        return dc_urls
+    
+    async def get_texas_datacenter_urls(self) -> List[str]:
+        city_urls = await self.get_texas_city_urls()
+        
+        if not city_urls:
+            logger.warning("No city URLs found. Trying direct approach...")
+            content = await self.get_page(f"{self.base_url}/usa/texas/")
+            all_dc_urls = await self._parse(extract_datacenter_urls, content, self.base_url) if content else []
+            logger.info(f"Direct approach found {len(all_dc_urls)} data center URLs")
+            return all_dc_urls
+        
+        city_results = await asyncio.gather(*(self.get_datacenters_from_city(u) for u in city_urls))
+        all_dc_urls = [url for city_dcs in city_results for url in city_dcs]
+        return self._dedupe_urls(all_dc_urls)
+    
+    async def scrape_data_center_page(self, url: str) -> Optional[DCRecord]:
+        content = await self.get_page(url)
+        if not content:
+            return None
+        return await self._parse(parse_data_center_page, url, content)
+    
+    async def scrape_all_texas(self, max_datacenters: Optional[int] = None,
+                               chunk_size: int = 50,
+                               start_index: int = 0,
+                               output_prefix: str = 'texas_datacenters') -> pd.DataFrame:
+        """
+        Scrape all Texas data centers concurrently, one chunk at a time
+        
+        Same arguments and outputs as TexasDataCenterScraper.scrape_all_texas;
+        a checkpoint is written after each chunk of `chunk_size` pages.
+        """
+        logger.info("Starting Texas data center scraping (async)...")
+        logger.info(f"Using {self.delay}s delay between requests per robots.txt, {self.max_workers} workers")
+        
+        dc_urls = await self.get_texas_datacenter_urls()
+        
+        if not dc_urls:
+            logger.error("No data center URLs found for Texas")
+            return pd.DataFrame()
+        
+        dc_urls = self._prepare_urls(dc_urls, max_datacenters, start_index, output_prefix)
+        total = len(dc_urls) + start_index
+        
+        final_file, final_f, final_writer = self._open_final(output_prefix)
+        count = 0
+        
+        with final_f:
+            for offset in range(0, len(dc_urls), chunk_size):
+                chunk = dc_urls[offset:offset + chunk_size]
+                results = await asyncio.gather(*(self.scrape_data_center_page(u) for u in chunk))
+                new_data = [dc_data for dc_url, dc_data in zip(chunk, results)
+                            if self._record_result(final_writer, dc_url, dc_data)]
+                count += len(new_data)
+                
+                final_f.flush()
+                self._save_checkpoint(new_data, start_index + offset + len(chunk), total, output_prefix)
+        
+        return self._load_final(final_file, count)
+
+
+async def run_async_scrape(output_dir: str = '.', delay: float = 30.0, refresh_index: bool = False,
+                           **kwargs) -> pd.DataFrame:
+    """Run AsyncScraper.scrape_all_texas inside a managed session"""
+    async with AsyncScraper(delay=delay, output_dir=output_dir, refresh_index=refresh_index) as scraper:
+        return await scraper.scrape_all_texas(**kwargs)
 
 
 def merge_chunks(prefix: str = 'texas_datacenters', output_dir: str = '.') -> pd.DataFrame:
@@ -559,7 +1243,12 @@ def merge_chunks(prefix: str = 'texas_datacenters', output_dir: str = '.') -> pd
 
 def main():
     """Main execution function"""
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Scrape Texas data centers from datacentermap.com')
+    parser.add_argument('--refresh-index', action='store_true',
+                        help='Ignore cached city/data center URL lists and refetch them')
+    args = parser.parse_args()
     
     print("=" * 60)
     print("TEXAS DATA CENTER SCRAPER")
@@ -587,7 +1276,7 @@ def main():
     print(f"\n✓ Output directory: {os.path.abspath(output_dir)}")
     
     # Initialize scraper with output directory
-    scraper = TexasDataCenterScraper(delay=30.0, output_dir=output_dir)
+    scraper = TexasDataCenterScraper(delay=30.0, output_dir=output_dir, refresh_index=args.refresh_index)
     
     # Mode selection
     print("\nSelect mode:")
@@ -595,8 +1284,9 @@ def main():
     print("2. Full scrape (all centers)")
     print("3. Resume from checkpoint (provide start index)")
     print("4. Merge existing chunks")
+    print("5. Full scrape, async pipeline (all centers)")
     
-    mode = input("Enter mode (1-4): ").strip()
+    mode = input("Enter mode (1-5): ").strip()
     
     if mode == '4':
         # Merge existing chunks
@@ -619,6 +1309,19 @@ def main():
             output_prefix='texas_datacenters'
         )
     
+    elif mode == '5':
+        # Full scrape with concurrent fetching/parsing under the same rate limit
+        print("\nRunning FULL MODE (async)...")
+        print("Progress will be saved every 50 centers (~25 minutes)")
+        
+        df = asyncio.run(run_async_scrape(
+            output_dir=output_dir,
+            delay=30.0,
+            refresh_index=args.refresh_index,
+            chunk_size=50,
+            output_prefix='texas_datacenters'
+        ))
+    
     elif mode == '2':
         # Full scrape
         confirm = input("\nThis will take ~3.3 hours. Continue? (yes/no): ").lower().strip()
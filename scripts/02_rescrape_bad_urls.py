@@ -1,10 +1,25 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import asyncio
+import csv
+import functools
+import multiprocessing
+import queue
+import requests
 import sys
 import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
 
 # Import the scraper
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from texas_datacenter_scraper import TexasDataCenterScraper
+from texas_datacenter_scraper import ERROR_PAGE_RE, FIELDNAMES, USER_AGENT, AsyncScraper, TexasDataCenterScraper
 import logging
 
 logging.basicConfig(
@@ -13,26 +28,295 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns read to flag and report bad records
+IDENTIFY_COLUMNS = ['url', 'name', 'city', 'latitude']
 
-def identify_bad_records(csv_file='texas_datacenters_MERGED.csv'):
+# Columns summarised in the final data quality report
+QUALITY_COLUMNS = ['latitude', 'city', 'operator']
+
+# Rows per chunk when merging and deduplicating the final dataset
+MERGE_CHUNKSIZE = 100_000
+
+# Parquet metadata key holding the "mtime_ns:size" of the CSV a sidecar was built from
+SIDECAR_SOURCE_KEY = b'source_csv_stat'
+
+# Column dtypes used to keep record frames small in memory
+CATEGORY_COLUMNS = {'city', 'operator', 'state'}
+STRING_COLUMNS = {'url', 'name'}
+
+
+def compact_dtypes(df):
+    """
+    Shrink the text columns of a records frame in place
+    
+    Repetitive columns become categories and free text Arrow-backed strings.
+    Coordinates stay float64: float32 would round them to about a metre.
+    """
+    for column in CATEGORY_COLUMNS.intersection(df.columns):
+        # Via strings first: an all-empty column reads as Arrow's null type,
+        # which can't be made categorical directly
+        df[column] = df[column].astype('string[pyarrow]').astype('category')
+    for column in STRING_COLUMNS.intersection(df.columns):
+        df[column] = df[column].astype('string[pyarrow]')
+    return df
+
+
+def flag_error_pages(records):
+    """Rows of `records` whose name is an error page placeholder"""
+    # Pattern text rather than the compiled regex so Arrow-backed columns can
+    # run it with their own regex kernel
+    is_error = records['name'].str.contains(ERROR_PAGE_RE.pattern, case=False, na=False)
+    return records.iloc[np.flatnonzero(is_error.to_numpy(dtype=bool))]
+
+
+def _sidecar_matches(sidecar, mtime_ns, size):
+    """Whether the Parquet sidecar was built from the CSV with this exact mtime and size"""
+    try:
+        metadata = pq.read_schema(sidecar).metadata or {}
+    except (OSError, ValueError):
+        return False
+    return metadata.get(SIDECAR_SOURCE_KEY) == f'{mtime_ns}:{size}'.encode()
+
+
+@functools.lru_cache(maxsize=4)
+def _read_records(csv_file, mtime_ns, size, chunksize=50_000):
+    """
+    Parse the CSV into (flagged bad rows, all rows)
+    
+    Memoized per (path, mtime, size), so calling identify_bad_records again
+    on an unchanged file (e.g. from a notebook) skips parsing entirely; a
+    rewritten file misses the cache and is read afresh.
+    """
+    sidecar = csv_file + '.parquet'
+    if _sidecar_matches(sidecar, mtime_ns, size):
+        bad_records = flag_error_pages(pd.read_parquet(sidecar, columns=IDENTIFY_COLUMNS))
+        df = pd.read_parquet(sidecar)
+    else:
+        # First pass: flag error page content chunk by chunk
+        chunks = pd.read_csv(csv_file, usecols=IDENTIFY_COLUMNS,
+                             dtype={'name': 'string', 'url': 'string'}, chunksize=chunksize)
+        bad_chunks = [flag_error_pages(chunk) for chunk in chunks]
+        bad_records = pd.concat(bad_chunks) if bad_chunks else pd.DataFrame(columns=IDENTIFY_COLUMNS)
+        
+        # Second pass: full rows, tokenized by Arrow's multithreaded reader
+        df = pd.read_csv(csv_file, engine='pyarrow', dtype_backend='pyarrow')
+        try:
+            # Tag the sidecar with the CSV it came from: an mtime comparison
+            # would trust it for a CSV swapped in with an older mtime
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                SIDECAR_SOURCE_KEY: f'{mtime_ns}:{size}'.encode(),
+            })
+            pq.write_table(table, sidecar, compression='zstd')
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not write Parquet sidecar {sidecar}: {e}")
+    
+    return bad_records, compact_dtypes(df)
+
+
+def identify_bad_records(csv_file='texas_datacenters_MERGED.csv', chunksize=50_000):
     """
     Find all records with error messages
+    
+    Error pages are spotted from a narrow chunked read of just the columns
+    needed to flag and report them; the full rows are read once afterwards
+    for the good records only. The full read is saved as a Parquet sidecar
+    next to the CSV, which later calls use while the CSV keeps the exact
+    mtime and size it was built from.
+    """
+    st = os.stat(csv_file)
+    bad_records, df = _read_records(csv_file, st.st_mtime_ns, st.st_size, chunksize)
+    
+    # Good records are the full rows minus the flagged ones. Chunk indexes
+    # continue across chunks, so they are row positions in the full read
+    keep = np.ones(len(df), dtype=bool)
+    keep[bad_records.index.to_numpy(dtype=np.intp)] = False
+    good_records = df.iloc[np.flatnonzero(keep)]
+    
+    # Copy so callers can't modify the memoized frame
+    return bad_records.copy(), good_records
+
+
+def write_deduplicated(src, dst, chunksize=MERGE_CHUNKSIZE):
+    """
+    Copy a records CSV keeping only the last row for each URL
+    
+    A first pass over just the url column maps each URL to its last row
+    position; a second pass streams the chunks through that filter. Only the
+    position index is held in memory, never the full rows. Values are read
+    as text so they're written back unchanged.
+    
+    Returns:
+        (rows written, non-null counts of QUALITY_COLUMNS)
+    """
+    last_row = {}
+    for chunk in pd.read_csv(src, usecols=['url'], dtype=str, chunksize=chunksize):
+        last_row.update(zip(chunk['url'], chunk.index))
+    keep = np.zeros(max(last_row.values(), default=-1) + 1, dtype=bool)
+    keep[list(last_row.values())] = True
+    
+    total = 0
+    counts = pd.Series(0, index=QUALITY_COLUMNS)
+    header = True
+    for chunk in pd.read_csv(src, dtype=str, keep_default_na=False, na_values=[''], chunksize=chunksize):
+        kept = chunk.iloc[np.flatnonzero(keep[chunk.index.to_numpy()])]
+        kept.to_csv(dst, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        total += len(kept)
+        counts += kept[QUALITY_COLUMNS].notna().sum()
+    return total, counts
+
+
+def _writer_loop(rows, path, batch_size=50):
+    """
+    Drain queued rows into the checkpoint CSV until a None sentinel arrives
+    
+    Runs on its own thread so disk writes never hold up scraping; the file
+    is flushed and fsynced every `batch_size` rows and once more at the end.
+    Returns the number of rows written.
+    """
+    with open(path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        written = 0
+        while True:
+            row = rows.get()
+            if row is None:
+                break
+            writer.writerow(row)
+            written += 1
+            if written % batch_size == 0:
+                f.flush()
+                os.fsync(f.fileno())
+                logger.info(f"Checkpoint saved: {path} ({written} fixed)")
+        f.flush()
+        os.fsync(f.fileno())
+    return written
+
+
+def make_session():
+    """
+    Build the pooled session shared by every sequential re-scrape
+    
+    Deliberately not the scraper's on-disk cached session: a cached copy of
+    the error page would just be served back instead of refetched.
+    """
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=20,
+        # Connection errors only: the scraper retries 429/5xx itself so the
+        # wait they ask for applies to every worker
+        max_retries=Retry(total=3, backoff_factor=1.5, status=0, respect_retry_after_header=False)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+async def rescrape_concurrently(urls, handle, output_dir='.', delay=30.0, concurrency=10):
     """
-    df = pd.read_csv(csv_file)
+    Fetch URLs with up to `concurrency` requests in flight
     
-    # Find records with error page content
-    error_patterns = ['full capacity', 'right place', "you're in the right"]
-    error_mask = df['name'].str.contains('|'.join(error_patterns), case=False, na=False)
+    The scraper's shared limiter still releases one request per `delay`
+    seconds; the semaphore only bounds how many responses are awaited or
+    parsed at once. `handle(url, dc_data)` is called as each page finishes.
+    """
+    sem = asyncio.BoundedSemaphore(concurrency)
     
-    bad_records = df[error_mask]
-    good_records = df[~error_mask]
+    async with AsyncScraper(delay=delay, output_dir=output_dir, max_workers=concurrency) as scraper:
+        async def bounded(url):
+            async with sem:
+                dc_data = await scraper.scrape_data_center_page(url)
+            handle(url, dc_data)
+        
+        await asyncio.gather(*(bounded(url) for url in urls))
+
+
+def rescrape_threaded(urls, handle, scraper, concurrency=8):
+    """
+    Fetch URLs from a thread pool with the blocking scraper
     
-    return bad_records, good_records
+    Workers share the scraper's session and its thread-safe request
+    spacing; results come back to the calling thread, which is the only
+    one that calls `handle(url, dc_data)` (and so writes the checkpoint).
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(scraper.scrape_data_center_page, url): url for url in urls}
+        for future in as_completed(futures):
+            handle(futures[future], future.result())
+
+
+# Result queue handed to each host worker process by _init_host_worker
+_host_results = None
+
 
+def _init_host_worker(results):
+    global _host_results
+    _host_results = results
 
-def rescrape_bad_urls(output_dir='.', delay=30.0):
+
+def _scrape_host_group(task):
+    """
+    Process pool worker: scrape one host's URLs in order with a scraper of its own
+    
+    Each process has its own session and request spacing, so every host
+    keeps its own rate limit while different hosts are fetched in parallel.
+    Each (url, dc_data) is put on the shared result queue as soon as it is
+    scraped, so the parent can checkpoint it straight away.
+    """
+    host, urls, delay, output_dir = task
+    session = make_session()
+    scraper = TexasDataCenterScraper(delay=delay, output_dir=output_dir, session=session)
+    try:
+        for idx, url in enumerate(urls, 1):
+            logger.info(f"Re-scraping {host} {idx}/{len(urls)}: {url}")
+            _host_results.put((url, scraper.scrape_data_center_page(url)))
+    finally:
+        session.close()
+
+
+def rescrape_by_host(hosts, handle, delay=30.0, output_dir='.'):
+    """
+    Scrape each host's URLs in its own worker process
+    
+    A host is never split across processes, so its delay still applies to
+    every request it receives. `handle(url, dc_data)` is called in this
+    process as each result arrives. A worker that raises, or that dies
+    outright (e.g. killed for memory), ends the wait and its error
+    (BrokenProcessPool for a dead process) is re-raised here.
+    """
+    tasks = [(host, urls, delay, output_dir) for host, urls in hosts.items()]
+    expected = sum(len(urls) for urls in hosts.values())
+    results = multiprocessing.Queue()
+    with ProcessPoolExecutor(len(tasks), initializer=_init_host_worker, initargs=(results,)) as executor:
+        futures = [executor.submit(_scrape_host_group, task) for task in tasks]
+        received = 0
+        while received < expected:
+            try:
+                url, dc_data = results.get(timeout=1)
+            except queue.Empty:
+                if all(future.done() for future in futures):
+                    break  # a worker failed; result() below re-raises its error
+                continue
+            handle(url, dc_data)
+            received += 1
+        for future in futures:
+            future.result()
+
+
+def rescrape_bad_urls(output_dir='.', delay=30.0, concurrency=10, backend='async', assume_yes=False):
     """
     Re-scrape all URLs that returned error pages
+    
+    With concurrency > 1 pages are fetched through the asyncio scraper, or
+    a thread pool around the blocking scraper with backend='threads';
+    concurrency=1 keeps the original one-at-a-time loop. URLs spanning
+    several hosts are instead split into one sequential worker process per
+    host (ignoring concurrency and backend), so per-host delays overlap.
+    assume_yes skips the confirmation prompt for unattended runs.
     """
     print("="*60)
     print("RE-SCRAPE BAD URLS")
@@ -47,6 +331,9 @@ def rescrape_bad_urls(output_dir='.', delay=30.0):
     
     # Identify bad records
     bad_records, good_records = identify_bad_records(csv_file)
+    # The memo only pays off for repeat calls (e.g. a notebook); here it would
+    # keep a second full copy of the records alive for the whole re-scrape
+    _read_records.cache_clear()
     
     print(f"\nTotal records in CSV: {len(bad_records) + len(good_records)}")
     print(f"Good records: {len(good_records)}")
@@ -60,75 +347,128 @@ def rescrape_bad_urls(output_dir='.', delay=30.0):
     print(f"\nSample of bad records:")
     print(bad_records[['name', 'city', 'latitude']].head(3))
     
-    # Get list of URLs to re-scrape
-    bad_urls = bad_records['url'].tolist()
+    # Rows to re-scrape, as plain (url,) tuples
+    bad_rows = list(bad_records[['url']].itertuples(index=False, name=None))
     
-    print(f"\nWill re-scrape {len(bad_urls)} URLs")
-    print(f"Estimated time: ~{len(bad_urls) * delay / 3600:.1f} hours")
+    print(f"\nWill re-scrape {len(bad_rows)} URLs")
+    print(f"Estimated time: ~{len(bad_rows) * delay / 3600:.1f} hours")
     
-    response = input(f"\nProceed with re-scraping? (yes/no): ").strip().lower()
-    if response != 'yes':
-        print("Cancelled.")
-        return
+    if not assume_yes:
+        response = input(f"\nProceed with re-scraping? (yes/no): ").strip().lower()
+        if response != 'yes':
+            print("Cancelled.")
+            return
     
-    # Initialize scraper with FIXED code
-    scraper = TexasDataCenterScraper(delay=delay, output_dir=output_dir)
+    # Fixed records are queued to a writer thread that appends them to one
+    # checkpoint file, so a checkpoint is a flush rather than a rewrite of
+    # everything so far and never blocks the scrape
+    checkpoint_file = os.path.join(output_dir, 'fixed_data_checkpoint.csv')
+    writer_q = queue.Queue()
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint-writer')
+    writer_future = writer.submit(_writer_loop, writer_q, checkpoint_file)
     
     # Re-scrape bad URLs
-    fixed_data = []
+    fixed_count = 0
     still_bad = []
+    done = 0
+    batch = []  # scraped records awaiting the error page check
     
-    for idx, url in enumerate(bad_urls, 1):
-        logger.info(f"Re-scraping {idx}/{len(bad_urls)}: {url}")
-        
-        dc_data = scraper.scrape_data_center_page(url)
-        
-        if dc_data and dc_data['name']:
-            # Check if it's still an error page
-            if 'full capacity' in dc_data['name'].lower() or 'right place' in dc_data['name'].lower():
+    def check_batch():
+        # One vectorized pass splits the batch into fixed records and error pages
+        nonlocal fixed_count
+        if not batch:
+            return
+        names = pd.Series([dc_data.name for _, dc_data in batch], dtype='string')
+        is_error = names.str.contains(ERROR_PAGE_RE).to_numpy()
+        for (url, dc_data), error in zip(batch, is_error):
+            if error:
                 logger.warning(f"Still getting error page for: {url}")
                 still_bad.append(url)
             else:
-                fixed_data.append(dc_data)
-                logger.info(f"Successfully fixed: {dc_data['name']}")
+                writer_q.put(asdict(dc_data))
+                fixed_count += 1
+                logger.info(f"Successfully fixed: {dc_data.name}")
+        batch.clear()
+    
+    def handle(url, dc_data):
+        nonlocal done
+        done += 1
+        
+        if dc_data and dc_data.name:
+            batch.append((url, dc_data))
         else:
             logger.warning(f"Failed to scrape: {url}")
             still_bad.append(url)
         
-        # Save progress every 50 records
-        if idx % 50 == 0:
-            temp_df = pd.DataFrame(fixed_data)
-            temp_file = os.path.join(output_dir, f'fixed_data_checkpoint_{idx}.csv')
-            temp_df.to_csv(temp_file, index=False)
-            logger.info(f"Checkpoint saved: {temp_file}")
+        # Hand progress to the writer every 50 records
+        if done % 50 == 0:
+            check_batch()
+    
+    hosts = defaultdict(list)
+    for url, in bad_rows:
+        hosts[urlsplit(url).netloc].append(url)
+    
+    try:
+        if len(hosts) > 1:
+            logger.info(f"URLs span {len(hosts)} hosts: scraping each sequentially in its own process "
+                        f"(--concurrency/--backend don't apply)")
+            rescrape_by_host(hosts, handle, delay=delay, output_dir=output_dir)
+        elif concurrency > 1 and backend == 'async':
+            asyncio.run(rescrape_concurrently((url for url, in bad_rows), handle, output_dir=output_dir,
+                                              delay=delay, concurrency=concurrency))
+        else:
+            # Initialize scraper with FIXED code, reusing one connection pool for every URL
+            session = make_session()
+            scraper = TexasDataCenterScraper(delay=delay, output_dir=output_dir, session=session)
+            
+            try:
+                if concurrency > 1:
+                    rescrape_threaded((url for url, in bad_rows), handle, scraper, concurrency=concurrency)
+                else:
+                    for idx, (url,) in enumerate(bad_rows, 1):
+                        logger.info(f"Re-scraping {idx}/{len(bad_rows)}: {url}")
+                        handle(url, scraper.scrape_data_center_page(url))
+            finally:
+                session.close()
+    finally:
+        check_batch()
+        writer_q.put(None)
+        writer.shutdown()
+    
+    # Re-raises a failed write (e.g. a full disk) before the partial
+    # checkpoint can be renamed or merged in place of the bad records
+    written = writer_future.result()
     
     # Save fixed data
-    if fixed_data:
-        fixed_df = pd.DataFrame(fixed_data)
+    if written:
         fixed_file = os.path.join(output_dir, 'texas_datacenters_fixed.csv')
-        fixed_df.to_csv(fixed_file, index=False)
-        print(f"\nSaved {len(fixed_df)} fixed records to {fixed_file}")
-        
-        # Merge good records + fixed records
-        combined = pd.concat([good_records, fixed_df], ignore_index=True)
+        os.replace(checkpoint_file, fixed_file)
+        print(f"\nSaved {written} fixed records to {fixed_file}")
         
-        # Remove duplicates (keep the newly scraped version)
-        combined = combined.drop_duplicates(subset=['url'], keep='last')
-        
-        # Save final complete dataset
+        # Stream good records then fixed records to disk, and let a chunked
+        # dedupe pass keep each URL's last row (newly scraped version wins)
         final_file = os.path.join(output_dir, 'texas_datacenters_final_clean.csv')
-        combined.to_csv(final_file, index=False)
-        print(f"Saved complete clean dataset ({len(combined)} records) to {final_file}")
+        merged_file = final_file + '.tmp'
+        columns = good_records.columns.union(FIELDNAMES, sort=False)
+        good_records.reindex(columns=columns).to_csv(merged_file, index=False)
+        for chunk in pd.read_csv(fixed_file, dtype=str, keep_default_na=False, chunksize=MERGE_CHUNKSIZE):
+            chunk.reindex(columns=columns).to_csv(merged_file, mode='a', header=False, index=False)
+        
+        try:
+            total, counts = write_deduplicated(merged_file, final_file)
+        finally:
+            os.remove(merged_file)
+        print(f"Saved complete clean dataset ({total} records) to {final_file}")
         
         # Summary
         print("\n" + "="*60)
         print("RE-SCRAPE SUMMARY")
         print("="*60)
-        print(f"Bad records identified: {len(bad_urls)}")
-        print(f"Successfully fixed: {len(fixed_df)}")
+        print(f"Bad records identified: {len(bad_rows)}")
+        print(f"Successfully fixed: {written}")
         print(f"Still bad/failed: {len(still_bad)}")
-        print(f"Final dataset: {len(combined)} records")
-        print(f"Success rate: {len(combined)/392*100:.1f}%")
+        print(f"Final dataset: {total} records")
+        print(f"Success rate: {total/392*100:.1f}%")
         
         if still_bad:
             print(f"\n{len(still_bad)} URLs still returning errors:")
@@ -141,11 +481,12 @@ def rescrape_bad_urls(output_dir='.', delay=30.0):
         print("\n" + "="*60)
         print("FINAL DATA QUALITY")
         print("="*60)
-        print(f"Records with coordinates: {combined['latitude'].notna().sum()} ({combined['latitude'].notna().sum()/len(combined)*100:.1f}%)")
-        print(f"Records with city: {combined['city'].notna().sum()} ({combined['city'].notna().sum()/len(combined)*100:.1f}%)")
-        print(f"Records with operator: {combined['operator'].notna().sum()} ({combined['operator'].notna().sum()/len(combined)*100:.1f}%)")
+        print(f"Records with coordinates: {counts['latitude']} ({counts['latitude']/total*100:.1f}%)")
+        print(f"Records with city: {counts['city']} ({counts['city']/total*100:.1f}%)")
+        print(f"Records with operator: {counts['operator']} ({counts['operator']/total*100:.1f}%)")
         
     else:
+        os.remove(checkpoint_file)
         print("\nNo records were successfully fixed.")
 
 
@@ -155,7 +496,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Re-scrape URLs that returned error pages')
     parser.add_argument('--output-dir', default='.', help='Output directory')
     parser.add_argument('--delay', type=float, default=30.0, help='Delay between requests (default: 30s)')
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='Maximum requests in flight; 1 scrapes sequentially (default: 10)')
+    parser.add_argument('--backend', choices=['async', 'threads'], default='async',
+                        help='Concurrent fetch backend: asyncio/aiohttp or a thread pool (default: async)')
+    parser.add_argument('--yes', '-y', action='store_true', help='Start without asking for confirmation')
     
     args = parser.parse_args()
     
-    rescrape_bad_urls(output_dir=args.output_dir, delay=args.delay)
+    rescrape_bad_urls(output_dir=args.output_dir, delay=args.delay,
+                      concurrency=args.concurrency, backend=args.backend, assume_yes=args.yes)